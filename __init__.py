@@ -3,15 +3,24 @@
 import logging
 import json
 import asyncio
+import time
 import aiohttp
 import async_timeout
 import voluptuous as vol
 import re
+import fnmatch
+from datetime import timedelta
 
 import homeassistant.helpers.config_validation as cv
 from homeassistant import config_entries
 from homeassistant.components import persistent_notification
+from homeassistant.components.group import (
+    ATTR_OBJECT_ID,
+    SERVICE_REMOVE,
+    DOMAIN as DOMAIN_GROUP
+)
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.const import (
     CONF_RESOURCE,
     CONF_USERNAME,
@@ -29,33 +38,84 @@ from .const import (
     DOMAIN,
     CONF_GETINFO,
     CONF_GETLIST,
+    CONF_GETLIST_INCLUDE,
+    CONF_GETLIST_EXCLUDE,
+    CONF_MAX_TIMEOUT,
+    CONF_EVENTS,
+    CONF_EVENTS_INTERVAL,
+    CONF_RATE_REQUESTS,
+    CONF_RATE_BYTES,
+    CONF_RATE_WRITE_SHARE,
     DEFAULT_TIMEOUT,
     DEFAULT_TIMEOUT_WAIT,
+    DEFAULT_MAX_TIMEOUT,
     DEFAULT_VERIFY_SSL,
+    DEFAULT_RATE_WRITE_SHARE,
+    DEFAULT_REFRESH_DELAY,
+    DEFAULT_EVENTS_INTERVAL,
     TECOAPI_GETINFO,
     TECOAPI_GETLIST,
+    TECOAPI_GETOBJECT,
+    CONF_OBJECT,
 )
 
 from .switch import SWITCH_SCHEMA
-from .sensor import SENSOR_SCHEMA
+from .sensor import SENSOR_SCHEMA, is_subobject
 from .binary_sensor import BINARY_SENSOR_SCHEMA
 from .services import async_register_services
-
-TECOAPI_SCHEMA = vol.Schema(
+from .latency import LatencyTracker
+from .ratelimit import RateLimiter
+from .endpoints import Endpoints
+from .events import TecoApiEvents
+
+def pattern_to_regex(pattern):
+    """Return the regular expression of a glob pattern, or of a regular expression prefixed with 're:'."""
+    return pattern[3:] if pattern.startswith("re:") else fnmatch.translate(pattern)
+
+def getlist_pattern(value):
+    """Validate a GetList include/exclude pattern."""
+    value = cv.string(value)
+    try:
+        re.compile(pattern_to_regex(value))
+    except re.error as err:
+        raise vol.Invalid(f"Invalid pattern {value}: {err}") from err
+    return value
+
+def compile_patterns(patterns):
+    """Compile glob patterns, or regular expressions prefixed with 're:'."""
+    return [re.compile(pattern_to_regex(pattern)) for pattern in patterns]
+
+def timeout_bounds(config):
+    """Default max_timeout to at least timeout and reject a max_timeout below it."""
+    if CONF_MAX_TIMEOUT not in config:
+        config[CONF_MAX_TIMEOUT] = max(DEFAULT_MAX_TIMEOUT, config[CONF_TIMEOUT])
+    elif config[CONF_MAX_TIMEOUT] < config[CONF_TIMEOUT]:
+        raise vol.Invalid(f"{CONF_MAX_TIMEOUT} must not be lower than {CONF_TIMEOUT}")
+    return config
+
+TECOAPI_SCHEMA = vol.All(vol.Schema(
     {
-        vol.Required(CONF_RESOURCE): cv.url,
+        vol.Required(CONF_RESOURCE): vol.All(cv.ensure_list, vol.Length(min = 1), [cv.url]),
         vol.Required(CONF_USERNAME): cv.string,
         vol.Required(CONF_PASSWORD): cv.string,
         vol.Optional(CONF_HEADERS): {cv.string: cv.string},
         vol.Optional(CONF_VERIFY_SSL, default = DEFAULT_VERIFY_SSL): cv.boolean,
         vol.Optional(CONF_TIMEOUT, default = DEFAULT_TIMEOUT): cv.positive_float,
+        vol.Optional(CONF_MAX_TIMEOUT): cv.positive_float,
+        vol.Optional(CONF_RATE_REQUESTS, default = 0): cv.positive_float,
+        vol.Optional(CONF_RATE_BYTES, default = 0): cv.positive_int,
+        vol.Optional(CONF_RATE_WRITE_SHARE, default = DEFAULT_RATE_WRITE_SHARE): vol.All(vol.Coerce(float), vol.Range(min = 0, max = 0.9)),
         vol.Optional(CONF_GETINFO, default = False): cv.boolean,
         vol.Optional(CONF_GETLIST, default = False): cv.boolean,
+        vol.Optional(CONF_GETLIST_INCLUDE, default = []): vol.All(cv.ensure_list, [getlist_pattern]),
+        vol.Optional(CONF_GETLIST_EXCLUDE, default = []): vol.All(cv.ensure_list, [getlist_pattern]),
+        vol.Optional(CONF_EVENTS, default = []): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(CONF_EVENTS_INTERVAL, default = timedelta(seconds = DEFAULT_EVENTS_INTERVAL)): cv.time_period,
         vol.Optional(CONF_SWITCHES, default = []): vol.All(cv.ensure_list, [vol.Schema(SWITCH_SCHEMA)]),
         vol.Optional(CONF_SENSORS, default = []): vol.All(cv.ensure_list, [vol.Schema(SENSOR_SCHEMA)]),
         vol.Optional(CONF_BINARY_SENSORS, default = []): vol.All(cv.ensure_list, [vol.Schema(BINARY_SENSOR_SCHEMA)]),
     }
-)
+), timeout_bounds)
 
 CONFIG_SCHEMA = vol.Schema({DOMAIN: TECOAPI_SCHEMA}, extra=vol.ALLOW_EXTRA)
 
@@ -97,9 +157,28 @@ class TecoApiData:
     def __init__(self, hass, config):
         """Init."""
         self.hass = hass
-        self.resource = config.get(CONF_RESOURCE)
-        if self.resource[-1] != '/':
-            self.resource += '/'
+        self.latency = None
+        self.endpoints = None
+        self.ratelimit = None
+        self._ratelimit_config = None
+        self.profiler = None
+        self.platforms = {}
+        self.objects = {}
+        self.roots = {}
+        self._refresh_pending = set()
+        self._refresh_task = None
+        self.parallel_updates_semaphore = asyncio.Semaphore(1)
+        self._reload_lock = asyncio.Lock()
+        self.events = TecoApiEvents(hass, self)
+        self._events_interval = None
+        self._events_unsub = None
+        self.configure(config)
+
+    def configure(self, config):
+        """Apply the connection settings."""
+        endpoints = Endpoints(config.get(CONF_RESOURCE))
+        if self.endpoints is None or self.endpoints.resources != endpoints.resources:
+            self.endpoints = endpoints
 
         username = config.get(CONF_USERNAME)
         password = config.get(CONF_PASSWORD)
@@ -110,68 +189,324 @@ class TecoApiData:
         self.headers = config.get(CONF_HEADERS)
         self.verify_ssl = config.get(CONF_VERIFY_SSL)
         self.timeout = config.get(CONF_TIMEOUT)
-        self.parallel_updates_semaphore = asyncio.Semaphore(1)
+        if self.latency is None:
+            self.latency = LatencyTracker(self.timeout, config.get(CONF_MAX_TIMEOUT), DEFAULT_TIMEOUT_WAIT)
+        else:
+            self.latency.min_timeout = self.timeout
+            self.latency.max_timeout = config.get(CONF_MAX_TIMEOUT)
+        ratelimit = (
+            config.get(CONF_RATE_REQUESTS),
+            config.get(CONF_RATE_BYTES),
+            config.get(CONF_RATE_WRITE_SHARE, DEFAULT_RATE_WRITE_SHARE),
+        )
+        if self.ratelimit is None or self._ratelimit_config != ratelimit:
+            self.ratelimit = RateLimiter(*ratelimit)
+            self._ratelimit_config = ratelimit
+        self.getlist_include = compile_patterns(config.get(CONF_GETLIST_INCLUDE, []))
+        self.getlist_exclude = compile_patterns(config.get(CONF_GETLIST_EXCLUDE, []))
+        self.event_objects = config.get(CONF_EVENTS, [])
+
+        interval = config.get(CONF_EVENTS_INTERVAL) if self.event_objects else None
+        if interval != self._events_interval:
+            if self._events_unsub:
+                self._events_unsub()
+                self._events_unsub = None
+            if interval:
+                self._events_unsub = async_track_time_interval(self.hass, self.events.async_poll, interval)
+            self._events_interval = interval
+
+    async def async_add_objects(self, platform, configs):
+        """Set up, add and group configured root objects of a platform, remembering them for reload."""
+        async_add_entities, setup, create_groups = self.platforms[platform]
+        objects = self.objects.setdefault(platform, [])
+
+        added = []
+        entities = []
+        for config in configs:
+            object_entities = []
+            await setup(self.hass, self, config, object_entities, config.get(CONF_OBJECT))
+            added.append([config, object_entities, []])
+            entities += object_entities
+
+        async_add_entities(entities, True)
+
+        if create_groups:
+            for item in added:
+                item[2] = await create_groups(self.hass, item[1])
+
+        objects += added
+
+    async def async_reload(self, config):
+        """Apply a new configuration, keeping unchanged objects running."""
+        async with self._reload_lock:
+            self.configure(config)
+
+            for platform, pconfig in FORWARD_PLATFORMS.items():
+                if platform not in self.platforms:
+                    continue
+
+                configs = list(config.get(pconfig, []))
+                objects = self.objects.setdefault(platform, [])
+
+                for item in list(objects):
+                    object_config, object_entities, groups = item
+                    if object_config in configs:
+                        configs.remove(object_config)
+                        continue
+
+                    objects.remove(item)
+                    for entity in object_entities:
+                        await entity.async_remove()
+                    for group_id in groups:
+                        await self.hass.services.async_call(
+                            DOMAIN_GROUP, SERVICE_REMOVE, {ATTR_OBJECT_ID: group_id}
+                        )
+
+                await self.async_add_objects(platform, configs)
+
+    def getlist_match(self, objectid):
+        """Return if a GetList object passes the include/exclude patterns."""
+        if self.getlist_include and not any(pattern.match(objectid) for pattern in self.getlist_include):
+            return False
+        return not any(pattern.match(objectid) for pattern in self.getlist_exclude)
+
+    def register_root(self, entity):
+        """Register a root entity for refreshes after writes."""
+        self.roots.setdefault(entity._objectid, set()).add(entity)
+
+    def unregister_root(self, entity):
+        """Unregister a root entity."""
+        self.roots.get(entity._objectid, set()).discard(entity)
+
+    def schedule_refresh(self, objectid):
+        """Schedule a read of the root objects of a written object, shared by a burst of writes."""
+        self._refresh_pending.add(objectid)
+        if self._refresh_task is None:
+            self._refresh_task = self.hass.async_create_task(self._async_refresh())
+
+    async def _async_refresh(self):
+        await asyncio.sleep(DEFAULT_REFRESH_DELAY)
+        objectids, self._refresh_pending = self._refresh_pending, set()
+        self._refresh_task = None
+
+        for root, entities in list(self.roots.items()):
+            if not any(is_subobject(objectid, root) or is_subobject(root, objectid) for objectid in objectids):
+                continue
+
+            # one read per root object and shape, array sensors need the whole array
+            reads = {}
+            for entity in list(entities):
+                reads.setdefault(bool(getattr(entity, "_arraysize", 0)), []).append(entity)
+
+            for array, readers in reads.items():
+                try:
+                    value = await self.async_get(TECOAPI_GETOBJECT, root, False, array)
+                except asyncio.TimeoutError:
+                    _LOGGER.warning("Timed out %s while refreshing", root)
+                    continue
+                except aiohttp.ClientError as err:
+                    _LOGGER.error("Error while %s refreshing: %s", root, err)
+                    continue
+
+                if value is None:
+                    continue
+
+                for entity in readers:
+                    entity.set_value(value)
+                    entity.async_write_ha_state()
+
+                    descendants = list(entity._children)
+                    while descendants:
+                        descendant = descendants.pop()
+                        descendants += descendant._children
+                        if descendant.hass is not None:
+                            descendant.async_write_ha_state()
+
+    @property
+    def diagnostics(self):
+        """Return request diagnostics."""
+        return {
+            "timeouts": self.latency.diagnostics,
+            "rate_limit": self.ratelimit.diagnostics,
+            "endpoints": self.endpoints.diagnostics,
+        }
 
     async def async_put(self, service, objectid, value):
         """Send a date to the TecoAPI."""
         websession = async_get_clientsession(self.hass, self.verify_ssl)
 
-        resource = self.resource + service
+        if objectid:
+            body = json.dumps({objectid: value})
+        else:
+            body = json.dumps(value)
 
-        async with self.parallel_updates_semaphore:
-            with async_timeout.timeout(self.timeout):
-                if objectid:
-                    body = json.dumps({objectid: value})
-                else:
-                    body = json.dumps(value)
+        key = service + ' ' + str(objectid)
 
-                req = await websession.put(
-                    resource,
-                    auth = self.auth,
-                    headers = self.headers,
-                    data = bytes(body, "ascii"),
-                )
+        await self.ratelimit.async_acquire(True, len(body))
 
-                if req.status == 204:
-                    return True
+        async with self.parallel_updates_semaphore:
+            timeout = self.latency.timeout(key)
+            start = time.monotonic()
+            try:
+                status = await self._async_put_failover(websession, service, body, timeout)
+            except asyncio.TimeoutError:
+                self.latency.record_timeout(key)
+                raise
+
+            elapsed = time.monotonic() - start
+            self.latency.record(key, elapsed)
+            if self.profiler:
+                self.profiler.add("TecoApiData.put network", elapsed)
+
+            if status == 204:
+                if objectid:
+                    self.schedule_refresh(objectid)
+                elif type(value) is dict:
+                    for written in value:
+                        self.schedule_refresh(written)
+                return True
 
-                _LOGGER.error(
-                    _LOGGER.debug("TecoApi PUT %s %s failed. Status: %s", service, body, req.status)
-                )
+            _LOGGER.error("TecoApi PUT %s %s failed. Status: %s", service, body, status)
 
         return False
 
-    async def async_get(self, service, objectid, wait):
-        """Get the latest data from TecoAPI."""
+    async def async_get(self, service, objectid, wait, array = False):
+        """Get the latest data from TecoAPI.
+
+        An ``[n]`` suffix on a path part selects that array element; with
+        ``array`` set, an array addressed by the last part is returned whole.
+        """
         websession = async_get_clientsession(self.hass, self.verify_ssl)
 
-        resource = self.resource + service
+        path = service
         if objectid:
-            resource += '?' + objectid
+            path += '?' + objectid
+
+        key = service + ' ' + str(objectid)
+
+        await self.ratelimit.async_acquire(False)
 
         async with self.parallel_updates_semaphore:
-            with async_timeout.timeout(DEFAULT_TIMEOUT_WAIT if wait else self.timeout):
-                req = await websession.get(
-                    resource,
-                    auth = self.auth,
-                    headers = self.headers,
-                )
-
-                if req.status == 200:
-                    text = await req.text()
-
-                    value = json.loads(text)    
-
-                    if objectid:
-                        for partid in objectid.split('.'):
-                            partid = re.sub(r'\[(\d+)\]$', '', partid)
-                            value = value[partid]
-                            if type(value) == list:
+            timeout = self.latency.timeout(key, wait = wait) + self.endpoints.hedge_allowance(self.timeout)
+            start = time.monotonic()
+            try:
+                with async_timeout.timeout(timeout):
+                    status, text = await self._async_get_hedged(websession, path)
+            except asyncio.TimeoutError:
+                self.latency.record_timeout(key)
+                raise
+
+            if status == 200:
+                elapsed = time.monotonic() - start
+                self.latency.record(key, elapsed, len(text))
+                self.ratelimit.consume_bytes(len(text))
+
+                profiler = self.profiler
+                if profiler:
+                    profiler.add("TecoApiData.get network", elapsed)
+                    start = time.monotonic()
+
+                value = json.loads(text)    
+
+                if profiler:
+                    profiler.add("TecoApiData.get json", time.monotonic() - start)
+                    start = time.monotonic()
+
+                if objectid:
+                    parts = objectid.split('.')
+                    for pos, partid in enumerate(parts):
+                        match = re.match(r'^(.*?)(?:\[(\d+)\])?$', partid)
+                        value = value[match.group(1)]
+                        if type(value) == list:
+                            if match.group(2) is not None:
+                                value = value[int(match.group(2))]
+                            elif not array or pos < len(parts) - 1:
                                 value = value[0]
-                    return value
 
-            _LOGGER.error(
-                _LOGGER.debug("TecoApi GET %s %s failed. Status: %s, %s", service, objectid, req.status, resource)
-            )
+                if profiler:
+                    profiler.add("TecoApiData.get navigate", time.monotonic() - start)
+                return value
+
+            _LOGGER.error("TecoApi GET %s %s failed. Status: %s", service, objectid, status)
 
         return None
+
+    async def _async_fetch(self, websession, endpoint, path):
+        """Read from one endpoint, tracking its latency."""
+        start = time.monotonic()
+        try:
+            req = await websession.get(
+                endpoint.resource + path,
+                auth = self.auth,
+                headers = self.headers,
+            )
+            text = await req.text() if req.status == 200 else None
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            endpoint.record_failure()
+            raise
+
+        endpoint.record(time.monotonic() - start)
+        return req.status, text
+
+    async def _async_get_hedged(self, websession, path):
+        """Read from the preferred endpoint, hedged by the next one when it is slower than usual."""
+        endpoints = self.endpoints.ordered()
+        primary = endpoints[0]
+        tasks = {asyncio.ensure_future(self._async_fetch(websession, primary, path)): primary}
+        error = None
+
+        try:
+            if len(endpoints) > 1:
+                done, _ = await asyncio.wait(list(tasks), timeout = primary.hedge_delay(self.timeout))
+                if (not done or next(iter(done)).exception() is not None) and self.ratelimit.try_acquire():
+                    self.endpoints.hedged += 1
+                    tasks[asyncio.ensure_future(self._async_fetch(websession, endpoints[1], path))] = endpoints[1]
+
+            while tasks:
+                done, _ = await asyncio.wait(list(tasks), return_when = asyncio.FIRST_COMPLETED)
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+
+                    if endpoint is not primary:
+                        endpoint.hedge_wins += 1
+                        if primary in tasks.values():
+                            primary.record_failure()
+                    return task.result()
+
+            raise error
+        except asyncio.CancelledError:
+            if primary in tasks.values():
+                primary.record_failure()
+            raise
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _async_put_failover(self, websession, service, body, timeout):
+        """Write to the preferred endpoint, failing over when it errors or stalls.
+
+        PutObject sets absolute values, so repeating a write on the next endpoint is safe.
+        """
+        endpoints = self.endpoints.ordered()
+
+        for endpoint in endpoints:
+            start = time.monotonic()
+            try:
+                with async_timeout.timeout(timeout):
+                    req = await websession.put(
+                        endpoint.resource + service,
+                        auth = self.auth,
+                        headers = self.headers,
+                        data = bytes(body, "ascii"),
+                    )
+            except (asyncio.TimeoutError, aiohttp.ClientError):
+                endpoint.record_failure()
+                if endpoint is endpoints[-1]:
+                    raise
+                continue
+
+            endpoint.record(time.monotonic() - start)
+            return req.status
@@ -55,9 +55,8 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         objectid = config.get(CONF_OBJECT)
         await async_setup_binary_sensor(hass, data, config, entities, objectid)
     else:
-        for child_config in discovery_info:
-            objectid = child_config.get(CONF_OBJECT)
-            await async_setup_binary_sensor(hass, data, child_config, entities, objectid)
+        data.platforms[DOMAIN_BINARY_SENSOR] = (async_add_entities, async_setup_binary_sensor, None)
+        await data.async_add_objects(DOMAIN_BINARY_SENSOR, discovery_info)
 
     async_add_entities(entities, True)
 
@@ -151,6 +150,16 @@ class TecoApiBinarySensor(BinarySensorEntity):
         """Return the state of the binary sensor."""
         return STATE_ON if self.is_on else STATE_OFF
 
+    async def async_added_to_hass(self):
+        """Register root entities for refreshes after writes."""
+        if self._parent is None:
+            self._data.register_root(self)
+
+    async def async_will_remove_from_hass(self):
+        """Unregister root entities."""
+        if self._parent is None:
+            self._data.unregister_root(self)
+
     async def async_update(self):
         """Get the current state, catching errors."""
         if self._parent is None:
@@ -159,7 +168,7 @@ class TecoApiBinarySensor(BinarySensorEntity):
                 if value is None:
                     _LOGGER.error("Unable to update %s", self._objectid)
                 else:
-                    self._value = value
+                    self.set_value(value)
 
             except asyncio.TimeoutError:
                 _LOGGER.warning("Timed out %s while fetching data", self._objectid)
@@ -167,6 +176,10 @@ class TecoApiBinarySensor(BinarySensorEntity):
                 _LOGGER.exception("Error while %s fetching data: %s", self._objectid, err)
 
     ### Heplers ###
+    def set_value(self, value):
+        """Store a value read for this root entity."""
+        self._value = value
+
     @property
     def child_values(self):
         if self._parent:
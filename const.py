@@ -6,16 +6,57 @@ DATA_TECOAPI = "tecoapi"
 CONF_OBJECT = "object"
 CONF_GETINFO = "getinfo"
 CONF_GETLIST = "getlist"
+CONF_GETLIST_INCLUDE = "getlist_include"
+CONF_GETLIST_EXCLUDE = "getlist_exclude"
 CONF_SUBOBJECTS = "subobjects"
 CONF_VALUE = "value"
 CONF_ARRAYSIZE = "arraysize"
+CONF_COMPACT = "compact"
+CONF_MAX_TIMEOUT = "max_timeout"
+CONF_EVENTS = "events"
+CONF_EVENTS_INTERVAL = "events_interval"
+CONF_RATE_REQUESTS = "rate_limit_requests"
+CONF_RATE_BYTES = "rate_limit_bytes"
+CONF_RATE_WRITE_SHARE = "rate_limit_write_share"
+
+ATTR_VALUES = "values"
+ATTR_CHANGES = "changes"
+ATTR_OBJECT = "object"
+ATTR_VALUE = "value"
+ATTR_OLD_VALUE = "old_value"
+
+EVENT_TECOAPI_CHANGED = "tecoapi_changed"
 
 DEFAULT_TIMEOUT = 0.3
 DEFAULT_TIMEOUT_WAIT = 10
+DEFAULT_MAX_TIMEOUT = 2
 DEFAULT_VERIFY_SSL = True
+DEFAULT_RATE_WRITE_SHARE = 0.2
+DEFAULT_REFRESH_DELAY = 0.1
+DEFAULT_EVENTS_INTERVAL = 3
+
+ENDPOINT_FAILURES = 3
+ENDPOINT_RETRY = 30
+ENDPOINT_LATENCY_WEIGHT = 0.2
+HEDGE_FACTOR = 2
+
+LATENCY_SAMPLES = 20
+LATENCY_MIN_SAMPLES = 3
+LATENCY_PERCENTILE = 95
+LATENCY_FACTOR = 2
+LATENCY_BACKOFF_STEPS = 3
 
 SERVICE_SET_OBJECT = "set_object"
 SERVICE_GET_OBJECT = "get_object"
+SERVICE_DIAGNOSTICS = "diagnostics"
+SERVICE_PROFILE = "profile"
+
+CONF_CYCLES = "cycles"
+CONF_CPU = "cpu"
+CONF_FILENAME = "filename"
+
+DEFAULT_PROFILE_CYCLES = 5
+DEFAULT_PROFILE_FILENAME = "tecoapi_profile.txt"
 
 TECOAPI_GETINFO = "GetInfo"
 TECOAPI_GETLIST = "GetList"
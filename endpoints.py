@@ -0,0 +1,95 @@
+"""Redundant TecoAPI endpoints of one controller."""
+import time
+
+from .const import (
+    ENDPOINT_FAILURES,
+    ENDPOINT_RETRY,
+    ENDPOINT_LATENCY_WEIGHT,
+    HEDGE_FACTOR,
+)
+
+class Endpoint:
+    """One network path to the controller."""
+
+    def __init__(self, resource):
+        """Init."""
+        if resource[-1] != '/':
+            resource += '/'
+        self.resource = resource
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0
+        self.requests = 0
+        self.hedge_wins = 0
+
+    @property
+    def available(self):
+        """Return if the endpoint is not failed over."""
+        return self.down_until <= time.monotonic()
+
+    def hedge_delay(self, default):
+        """Return how long to wait for this endpoint before hedging."""
+        if self.latency is None:
+            return default
+        return max(self.latency * HEDGE_FACTOR, default)
+
+    def record(self, elapsed):
+        """Record an answered request."""
+        self.requests += 1
+        self.failures = 0
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency += (elapsed - self.latency) * ENDPOINT_LATENCY_WEIGHT
+
+    def record_failure(self):
+        """Record a failed or stalled request, failing over after repeated failures."""
+        self.requests += 1
+        self.failures += 1
+        if self.failures >= ENDPOINT_FAILURES:
+            self.down_until = time.monotonic() + ENDPOINT_RETRY
+            self.failures = 0
+            self.latency = None
+
+class Endpoints:
+    """Latency ordered endpoints of a controller."""
+
+    def __init__(self, resources):
+        """Init."""
+        self.endpoints = [Endpoint(resource) for resource in resources]
+        self.hedged = 0
+
+    @property
+    def resources(self):
+        """Return the endpoint resources."""
+        return [endpoint.resource for endpoint in self.endpoints]
+
+    def hedge_allowance(self, default):
+        """Return the extra time a read needs to leave room for a hedge."""
+        if len(self.endpoints) < 2:
+            return 0
+        return self.ordered()[0].hedge_delay(default)
+
+    def ordered(self):
+        """Return the endpoints, available ones first, untested or fastest first."""
+        return sorted(
+            self.endpoints,
+            key=lambda endpoint: (not endpoint.available, endpoint.latency or 0),
+        )
+
+    @property
+    def diagnostics(self):
+        """Return endpoint diagnostics."""
+        return {
+            "hedged": self.hedged,
+            "endpoints": [
+                {
+                    "resource": endpoint.resource,
+                    "available": endpoint.available,
+                    "latency": endpoint.latency,
+                    "requests": endpoint.requests,
+                    "hedge_wins": endpoint.hedge_wins,
+                }
+                for endpoint in self.endpoints
+            ],
+        }
@@ -0,0 +1,69 @@
+"""Batched change events of watched TecoAPI objects."""
+import logging
+import asyncio
+import aiohttp
+
+from .const import (
+    EVENT_TECOAPI_CHANGED,
+    ATTR_CHANGES,
+    ATTR_OBJECT,
+    ATTR_VALUE,
+    ATTR_OLD_VALUE,
+    TECOAPI_GETOBJECT,
+)
+from .sensor import iter_leaves, is_subobject, root_object
+
+_LOGGER = logging.getLogger(__name__)
+
+class TecoApiEvents:
+    """Poll the watched objects and fire one event per cycle with the changed leaves."""
+
+    def __init__(self, hass, data):
+        """Init."""
+        self.hass = hass
+        self._data = data
+        self._snapshot = {}
+        self._polling = False
+
+    async def async_poll(self, now = None):
+        """Read each root object of the watched objects once and compare against the previous snapshot."""
+        if self._polling:
+            return
+
+        watched = {}
+        for objectid in self._data.event_objects:
+            watched.setdefault(root_object(objectid), []).append(objectid)
+
+        for root in set(self._snapshot) - set(watched):
+            del self._snapshot[root]
+
+        self._polling = True
+        try:
+            changes = []
+            for root, objectids in watched.items():
+                try:
+                    value = await self._data.async_get(TECOAPI_GETOBJECT, root, False, True)
+                except asyncio.TimeoutError:
+                    _LOGGER.warning("Timed out %s while fetching data", root)
+                    continue
+                except aiohttp.ClientError as err:
+                    _LOGGER.error("Error while %s fetching data: %s", root, err)
+                    continue
+
+                if value is None:
+                    continue
+
+                previous = self._snapshot.get(root, {})
+                snapshot = {}
+                for path, item in iter_leaves(value, root):
+                    if not any(is_subobject(path, objectid) for objectid in objectids):
+                        continue
+                    if path in previous and previous[path] != item:
+                        changes.append({ATTR_OBJECT: path, ATTR_VALUE: item, ATTR_OLD_VALUE: previous[path]})
+                    snapshot[path] = item
+                self._snapshot[root] = snapshot
+        finally:
+            self._polling = False
+
+        if changes:
+            self.hass.bus.async_fire(EVENT_TECOAPI_CHANGED, {ATTR_CHANGES: changes})
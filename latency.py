@@ -0,0 +1,87 @@
+"""Round trip tracking for TecoAPI requests."""
+from collections import deque
+
+from .const import (
+    LATENCY_SAMPLES,
+    LATENCY_MIN_SAMPLES,
+    LATENCY_PERCENTILE,
+    LATENCY_FACTOR,
+    LATENCY_BACKOFF_STEPS,
+)
+
+def percentile(samples, percent):
+    """Return the given percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+class LatencyTracker:
+    """Rolling round trip times per object and per payload size."""
+
+    def __init__(self, min_timeout, max_timeout, wait_timeout):
+        """Init."""
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.wait_timeout = wait_timeout
+        self.requests = 0
+        self.timeouts = 0
+
+        self._objects = {}
+        self._backoff = {}
+        self._sizes = {}
+        self._object_sizes = {}
+        self._chosen = {}
+
+    def timeout(self, key, size = None, wait = False):
+        """Return the timeout for the next request of an object."""
+        self.requests += 1
+        if wait:
+            return self.wait_timeout
+
+        samples = self._objects.get(key)
+        if samples is None or len(samples) < LATENCY_MIN_SAMPLES:
+            if size is None:
+                size = self._object_sizes.get(key)
+            if size is not None:
+                samples = self._sizes.get(size.bit_length())
+
+        if samples is not None and len(samples) >= LATENCY_MIN_SAMPLES:
+            timeout = percentile(samples, LATENCY_PERCENTILE) * LATENCY_FACTOR
+        else:
+            timeout = self.min_timeout
+
+        timeout *= 2 ** self._backoff.get(key, 0)
+        timeout = min(max(timeout, self.min_timeout), self.max_timeout)
+
+        self._chosen[key] = timeout
+        return timeout
+
+    def record(self, key, elapsed, size = None):
+        """Record a completed request, size is the response size of reads."""
+        self._samples(self._objects, key).append(elapsed)
+        self._backoff.pop(key, None)
+        if size is not None:
+            self._samples(self._sizes, size.bit_length()).append(elapsed)
+            self._object_sizes[key] = size
+
+    def record_timeout(self, key):
+        """Record a timed out request, doubling its timeout up to a few steps until it answers."""
+        self.timeouts += 1
+        self._backoff[key] = min(self._backoff.get(key, 0) + 1, LATENCY_BACKOFF_STEPS)
+
+    @property
+    def diagnostics(self):
+        """Return timeout diagnostics."""
+        return {
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "timeout_rate": self.timeouts / self.requests if self.requests else 0,
+            "timeout_chosen": dict(self._chosen),
+            "round_trip_p50": {key: percentile(samples, 50) for key, samples in self._objects.items()},
+            "round_trip_p95": {key: percentile(samples, 95) for key, samples in self._objects.items()},
+        }
+
+    @staticmethod
+    def _samples(samples, key):
+        if key not in samples:
+            samples[key] = deque(maxlen = LATENCY_SAMPLES)
+        return samples[key]
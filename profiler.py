@@ -0,0 +1,120 @@
+"""On-demand profiling of the TecoAPI hot paths."""
+import asyncio
+import cProfile
+import io
+import pstats
+import time
+from functools import wraps
+
+from .sensor import TecoApiSensor
+from .switch import TecoApiSwitch
+from .binary_sensor import TecoApiBinarySensor
+
+INSTRUMENTED = {
+    TecoApiSensor: ("async_update", "state", "child_values", "async_update_ha_state", "_async_write_ha_state"),
+    TecoApiSwitch: ("async_update", "is_on", "child_values", "async_update_ha_state", "_async_write_ha_state"),
+    TecoApiBinarySensor: ("async_update", "is_on", "child_values", "async_update_ha_state", "_async_write_ha_state"),
+}
+
+class Profiler:
+    """Stage timings collected while profiling is on."""
+
+    def __init__(self, cpu):
+        """Init."""
+        self.stages = {}
+        self._patched = []
+        self._cpu = cProfile.Profile() if cpu else None
+        self._start = None
+        self._elapsed = None
+
+    def add(self, stage, elapsed):
+        """Add a stage timing."""
+        stats = self.stages.get(stage)
+        if stats is None:
+            self.stages[stage] = [1, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+
+    def start(self):
+        """Instrument the entity classes and start the profile."""
+        for cls, names in INSTRUMENTED.items():
+            for name in names:
+                if hasattr(cls, name):
+                    self._instrument(cls, name)
+
+        self._start = time.monotonic()
+        if self._cpu:
+            self._cpu.enable()
+
+    def stop(self):
+        """Stop the profile and restore the entity classes."""
+        if self._cpu:
+            self._cpu.disable()
+        self._elapsed = time.monotonic() - self._start
+
+        for cls, name, original in reversed(self._patched):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._patched = []
+
+    def report(self):
+        """Return the profile report."""
+        lines = [f"TecoAPI profile, {self._elapsed:.3f} s", ""]
+        lines.append(f"{'stage':<40} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}")
+        for stage, (count, total, maximum) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{stage:<40} {count:>8} {total:>10.3f} {total / count * 1000:>10.3f} {maximum * 1000:>10.3f}")
+
+        if self._cpu:
+            stream = io.StringIO()
+            pstats.Stats(self._cpu, stream=stream).sort_stats("cumulative").print_stats(50)
+            lines += ["", stream.getvalue()]
+
+        return "\n".join(lines)
+
+    def _instrument(self, cls, name):
+        original = cls.__dict__.get(name)
+        target = getattr(cls, name)
+        stage = cls.__name__ + "." + name
+
+        if isinstance(target, property):
+            fget = target.fget
+            depth = [0]
+
+            def timed_get(entity):
+                # child_values recurses up the tree, only the outermost access is timed
+                depth[0] += 1
+                start = time.perf_counter()
+                try:
+                    return fget(entity)
+                finally:
+                    depth[0] -= 1
+                    if not depth[0]:
+                        self.add(stage, time.perf_counter() - start)
+
+            wrapped = property(timed_get, target.fset)
+        elif asyncio.iscoroutinefunction(target):
+
+            @wraps(target)
+            async def wrapped(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await target(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+        else:
+
+            @wraps(target)
+            def wrapped(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return target(*args, **kwargs)
+                finally:
+                    self.add(stage, time.perf_counter() - start)
+
+        setattr(cls, name, wrapped)
+        self._patched.append((cls, name, original))
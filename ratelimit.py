@@ -0,0 +1,103 @@
+"""Request rate limiting for the TecoAPI web server."""
+import asyncio
+import time
+
+class TokenBucket:
+    """Token bucket refilled at a constant rate, holding up to one second of tokens.
+
+    A reserved share of the capacity is left to writes; the capacity is large enough
+    that a single read still fits above the reserve at low rates.
+    """
+
+    def __init__(self, rate, reserve):
+        """Init."""
+        self.rate = rate
+        self.reserve = reserve
+        self.capacity = max(rate, 1 / (1 - reserve))
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def delay(self, amount, write):
+        """Return the wait until amount tokens, above the reserve for reads, are available."""
+        self._refill()
+        reserve = 0 if write else self.reserve * self.capacity
+        needed = min(amount + reserve, self.capacity)
+        return max(0, (needed - self.tokens) / self.rate)
+
+    def consume(self, amount):
+        """Take tokens, the bucket may go into debt."""
+        self._refill()
+        self.tokens -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+class RateLimiter:
+    """Requests and bytes per second limits of a controller, with a share reserved for writes."""
+
+    def __init__(self, requests_rate, bytes_rate, write_share):
+        """Init."""
+        self._requests = TokenBucket(requests_rate, write_share) if requests_rate else None
+        self._bytes = TokenBucket(bytes_rate, write_share) if bytes_rate else None
+
+        self.throttled = {"read": 0, "write": 0, "hedge": 0}
+        self.delay = {"read": 0.0, "write": 0.0}
+        self.max_delay = {"read": 0.0, "write": 0.0}
+
+    async def async_acquire(self, write, size = 0):
+        """Wait until the request fits into the limits."""
+        kind = "write" if write else "read"
+        total = 0
+
+        while True:
+            delay = 0
+            if self._requests:
+                delay = self._requests.delay(1, write)
+            if self._bytes:
+                delay = max(delay, self._bytes.delay(size, write))
+            if delay <= 0:
+                break
+
+            total += delay
+            await asyncio.sleep(delay)
+
+        if self._requests:
+            self._requests.consume(1)
+        if self._bytes:
+            self._bytes.consume(size)
+
+        if total:
+            self.throttled[kind] += 1
+            self.delay[kind] += total
+            self.max_delay[kind] = max(self.max_delay[kind], total)
+
+    def try_acquire(self):
+        """Take a read request token if one is available right now."""
+        delay = 0
+        if self._requests:
+            delay = self._requests.delay(1, False)
+        if self._bytes:
+            delay = max(delay, self._bytes.delay(0, False))
+        if delay > 0:
+            self.throttled["hedge"] += 1
+            return False
+
+        if self._requests:
+            self._requests.consume(1)
+        return True
+
+    def consume_bytes(self, size):
+        """Account a response size."""
+        if self._bytes:
+            self._bytes.consume(size)
+
+    @property
+    def diagnostics(self):
+        """Return throttling diagnostics."""
+        return {
+            "throttled": dict(self.throttled),
+            "throttle_delay": dict(self.delay),
+            "throttle_max_delay": dict(self.max_delay),
+        }
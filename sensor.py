@@ -1,6 +1,8 @@
 """"TecoAPI Sensor."""
 import logging
+import re
 from datetime import timedelta
+from array import array
 import asyncio
 import voluptuous as vol
 import aiohttp
@@ -32,6 +34,8 @@ from .const import (
     CONF_OBJECT,
     CONF_SUBOBJECTS,
     CONF_ARRAYSIZE,
+    CONF_COMPACT,
+    ATTR_VALUES,
     TECOAPI_GETOBJECT,
     TECOAPI_GETINFO,
     TECOAPI_GETLIST,
@@ -43,6 +47,7 @@ SENSOR_SCHEMA = {
     vol.Optional(CONF_DEVICE_CLASS): DEVICE_CLASSES_SCHEMA,
     vol.Optional(CONF_UNIT_OF_MEASUREMENT, default=""): cv.string,
     vol.Optional(CONF_ARRAYSIZE, default=0): cv.positive_int,
+    vol.Optional(CONF_COMPACT, default=False): cv.boolean,
     vol.Optional(CONF_SUBOBJECTS, default=[]): vol.All(cv.ensure_list, [vol.Self]), 
 }
 
@@ -53,6 +58,38 @@ SCAN_INTERVAL = timedelta(seconds=3)
 
 _LOGGER = logging.getLogger(__name__)
 
+def array_buffer(values):
+    """Pack a TecoAPI array into a compact buffer."""
+    if all(type(item) is int for item in values):
+        typecode = 'q'
+    elif all(type(item) in (int, float) for item in values):
+        typecode = 'd'
+    else:
+        return tuple(values)
+
+    try:
+        return array(typecode, values)
+    except OverflowError:
+        return tuple(values)
+
+def iter_leaves(value, prefix = ""):
+    """Iterate path/value pairs of the leaves of a TecoAPI structure."""
+    if type(value) is dict:
+        for key, item in value.items():
+            yield from iter_leaves(item, prefix + '.' + key if prefix else key)
+    elif isinstance(value, (list, tuple, array)):
+        for i, item in enumerate(value):
+            yield from iter_leaves(item, prefix + '[' + str(i) + ']')
+    else:
+        yield prefix, value
+
+def is_subobject(objectid, parentid):
+    """Return if objectid is parentid or one of its members or elements."""
+    return objectid == parentid or objectid.startswith((parentid + '.', parentid + '['))
+
+def root_object(objectid):
+    """Return the root object of a member or element path."""
+    return re.split(r'[.\[]', objectid, 1)[0]
 
 async def create_group(hass, name, entities):
     """Create group"""
@@ -80,6 +117,19 @@ async def create_group(hass, name, entities):
                 )
             )
 
+    return group_id
+
+async def async_create_groups(hass, entities):
+    """Create groups of the root sensors with several leaves, returning their ids."""
+    groups = []
+    for entity in entities:
+        if entity._parent is None:
+            sensors = entity.get_all_sensors()
+            if len(sensors) > 1:
+                groups.append(await create_group(hass, entity.name, sensors))
+
+    return groups
+
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the TecoAPI sensor."""
 
@@ -99,62 +149,68 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         await async_setup_sensor(hass, data, xconfig, entities, TECOAPI_GETINFO)
     elif discovery_info == TECOAPI_GETLIST:
         objects = await data.async_get(TECOAPI_GETLIST, None, True)
-        for objectid in objects:
-            await async_setup_sensor(hass, data, None, entities, objectid)
+        async_add_entities(
+            [TecoApiLazySensor(data, objectid, async_add_entities) for objectid in objects if data.getlist_match(objectid)],
+            False,
+        )
     else:
-        for child_config in discovery_info:
-            objectid = child_config.get(CONF_OBJECT)
-            await async_setup_sensor(hass, data, child_config, entities, objectid)
+        data.platforms[DOMAIN_SENSOR] = (async_add_entities, async_setup_sensor, async_create_groups)
+        await data.async_add_objects(DOMAIN_SENSOR, discovery_info)
 
     async_add_entities(entities, True)
 
-    for entity in entities:
-        if entity._parent is None:
-            entities = entity.get_all_sensors()
-            if len(entities) > 1:
-                await create_group(hass, entity.name, entities)
+    await async_create_groups(hass, entities)
 
-async def async_setup_sensor(hass, data, config, entities, objectid, parent = None):
+async def async_setup_sensor(hass, data, config, entities, objectid, parent = None, index = None):
     """Set up sensor helper """
     # pylint: disable=too-many-arguments
     try:
+        arraysize = config.get(CONF_ARRAYSIZE) if index is None else 0
+
         if parent is None:
             if objectid == TECOAPI_GETINFO:
                 value = await data.async_get(TECOAPI_GETINFO, None, True)
             else:
-                value = await data.async_get(TECOAPI_GETOBJECT, objectid, True)
+                value = await data.async_get(TECOAPI_GETOBJECT, objectid, True, bool(arraysize))
+        elif index is not None:
+            value = parent.child_values[index]
         else:
             value = parent.child_values[objectid]
 
-        arraysize = config.get(CONF_ARRAYSIZE)
+        if arraysize:
+            if type(value) is not list:
+                _LOGGER.error("Unable to setup %s as array", objectid)
+                return
 
-        if type(value) is dict:
-            arrayitems = [None]
-            if arraysize is not None and arraysize > 0:
-                arrayitems = range(arraysize)
+            sensor = TecoApiSensor(data, config, objectid, value, parent, None)
+            pos = len(entities)
+
+            if not config.get(CONF_COMPACT):
+                for i in range(min(arraysize, len(value))):
+                    await async_setup_sensor(hass, data, config, entities, objectid, sensor, i)
 
-            for i in arrayitems:
-                objectidx = objectid
-                if i is not None:
-                    objectidx = f"{objectid}[{i}]"
-                    
-                sensor = TecoApiSensor(data, config, objectidx, value, parent, i)
-                pos = len(entities)
+            if parent is None or not sensor._children:
+                entities.insert(pos, sensor)
+        elif type(value) is dict:
+            sensor = TecoApiSensor(data, config, objectid, value, parent, index)
+            pos = len(entities)
 
-                sensors_config = config.get(CONF_SUBOBJECTS, [])
+            sensors_config = config.get(CONF_SUBOBJECTS, [])
 
+            if sensor._compact:
+                for child_config in sensors_config:
+                    childid = child_config.get(CONF_OBJECT)
+                    if childid in value:
+                        await async_setup_sensor(hass, data, child_config, entities, childid, sensor)
+            else:
                 for childid in value:
                     child_config = next((item for item in sensors_config if item.get(CONF_OBJECT) == childid), {})
                     await async_setup_sensor(hass, data, child_config, entities, childid, sensor)
 
-                if parent is None or not sensor._children:
-                    entities.insert(pos, sensor)                
-        elif type(value) is not None:
-            if arraysize is not None and arraysize > 0:
-                for i in range(arraysize):
-                    entities.append(TecoApiSensor(data, config, f"{objectid}[{i}]", value, parent, i))
-            else:
-                entities.append(TecoApiSensor(data, config, objectid, value, parent, None))
+            if parent is None or sensor._compact or not sensor._children:
+                entities.insert(pos, sensor)
+        elif value is not None:
+            entities.append(TecoApiSensor(data, config, objectid, value, parent, index))
         else:
             _LOGGER.error("Unable to setup %s", objectid)
 
@@ -174,28 +230,42 @@ class TecoApiSensor(Entity):
         self._name = config.get(CONF_NAME)
         self._device_class = config.get(CONF_DEVICE_CLASS)
         self._unit_of_measurement = config.get(CONF_UNIT_OF_MEASUREMENT)
+        self._arraysize = config.get(CONF_ARRAYSIZE) if index is None else 0
+        self._compact = bool(config.get(CONF_COMPACT) and (self._arraysize or type(value) is dict))
+        self._leaves = {} if self._compact and not self._arraysize else None
 
         self._data = data
         self._objectid = objectid 
         self._parent = parent
+        self._index = index
 
         self._children = []
         if parent: 
             parent._children.append(self)
-            self._name = self._name or parent._name + ' ' + objectid
+            if index is not None:
+                self._name = parent._name + ' ' + str(index)
+            else:
+                self._name = self._name or parent._name + ' ' + objectid
         else:
             self._name = self._name or objectid
+            if self._arraysize:
+                value = array_buffer(value)
             self._value = value #only root items store data
+            self._compacts = []
 
-        if index is not None and index >= 0:
-            self._name += ' ' + str(index)
+        if self._leaves is not None:
+            root = self
+            while root._parent:
+                root = root._parent
+            root._compacts.append(self)
+            self.refresh_leaves()
 
         self.entity_id = self.unique_id
 
     @property
     def unique_id(self):
         """Return unique identifier."""
-        return DOMAIN_SENSOR + "." + DOMAIN + "_" + self.fullobjectid.lower().replace(".", "_")
+        return DOMAIN_SENSOR + "." + DOMAIN + "_" + re.sub(r'[.\[]', '_', self.fullobjectid.lower()).replace("]", "")
 
     @property
     def name(self):
@@ -210,19 +280,43 @@ class TecoApiSensor(Entity):
     @property
     def state(self):
         """Return the state of the sensor."""
+        if self._leaves is not None:
+            return len(self._leaves)
+
         if self._children:
             return None 
 
-        if self._parent:
-            return self._parent.child_values[self._objectid]
-        else:
-            return self._value
+        if self._arraysize:
+            return len(self.child_values)
+
+        return self.child_values
+
+    @property
+    def extra_state_attributes(self):
+        """Return the values of a compact sensor."""
+        if not self._compact:
+            return None
+
+        if self._arraysize:
+            return {ATTR_VALUES: list(self.child_values)}
+
+        return self._leaves
 
     @property
     def unit_of_measurement(self):
         """Return the unit of measurement."""
         return self._unit_of_measurement
 
+    async def async_added_to_hass(self):
+        """Register root entities for refreshes after writes."""
+        if self._parent is None:
+            self._data.register_root(self)
+
+    async def async_will_remove_from_hass(self):
+        """Unregister root entities."""
+        if self._parent is None:
+            self._data.unregister_root(self)
+
     async def async_update(self):
         """Get the current state, catching errors."""
         if self._parent is None:
@@ -230,12 +324,12 @@ class TecoApiSensor(Entity):
                 if self._objectid == TECOAPI_GETINFO:
                     value = await self._data.async_get(TECOAPI_GETINFO, None, False)
                 else:
-                    value = await self._data.async_get(TECOAPI_GETOBJECT, self._objectid, False)
+                    value = await self._data.async_get(TECOAPI_GETOBJECT, self._objectid, False, bool(self._arraysize))
 
                 if value is None:
                     _LOGGER.error("Unable to update %s", self._objectid)
                 else:
-                    self._value = value
+                    self.set_value(value)
 
             except asyncio.TimeoutError:
                 _LOGGER.warning("Timed out %s while fetching data", self._objectid)
@@ -245,7 +339,9 @@ class TecoApiSensor(Entity):
     ### Heplers ###
     @property
     def child_values(self):
-        if self._parent:
+        if self._index is not None:
+            ret = self._parent.child_values[self._index]
+        elif self._parent:
             ret = self._parent.child_values[self._objectid]
         else: 
             ret = self._value
@@ -254,11 +350,38 @@ class TecoApiSensor(Entity):
 
     @property
     def fullobjectid(self):
-        if self._parent:
+        if self._index is not None:
+            return self._parent.fullobjectid + '[' + str(self._index) + ']'
+        elif self._parent:
             return self._parent.fullobjectid + '.' + self._objectid
         else:
             return self._objectid
 
+    def set_value(self, value):
+        """Store a value read for this root sensor."""
+        if self._arraysize:
+            self._value = array_buffer(value)
+        else:
+            self._value = value
+            for sensor in self._compacts:
+                sensor.refresh_leaves()
+
+    def refresh_leaves(self):
+        """Update the leaf map of a compact sensor in place, touching changed keys only."""
+        leaves = self._leaves
+        seen = 0
+
+        for key, value in iter_leaves(self.child_values):
+            seen += 1
+            if key not in leaves or leaves[key] != value:
+                leaves[key] = value
+
+        # every seen key is in the map, so the counts differ only if stale keys remain
+        if seen != len(leaves):
+            current = {key for key, _ in iter_leaves(self.child_values)}
+            for key in leaves.keys() - current:
+                del leaves[key]
+
     def get_all_sensors(self, sensors = None):
         if sensors is None:
             sensors = []
@@ -270,3 +393,55 @@ class TecoApiSensor(Entity):
             sensors.append(self)
 
         return sensors
+
+class TecoApiLazySensor(TecoApiSensor):
+    """TecoAPI Sensor placeholder for a GetList object, materialized on its first update."""
+
+    def __init__(self, data, objectid, async_add_entities):
+        """Init."""
+        super().__init__(data, {}, objectid, None, None, None)
+        self._async_add_entities = async_add_entities
+
+    @property
+    def entity_registry_enabled_default(self):
+        """Return False, placeholders are built only once enabled."""
+        return False
+
+    def set_value(self, value):
+        """Store a value read for this root sensor once it is built."""
+        if self._async_add_entities is None:
+            super().set_value(value)
+
+    async def async_update(self):
+        """Fetch the structure and set up the child sensors on the first update, retried until it succeeds."""
+        if self._async_add_entities is None:
+            await super().async_update()
+            return
+
+        try:
+            value = await self._data.async_get(TECOAPI_GETOBJECT, self._objectid, False)
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Timed out %s while fetching data", self._objectid)
+            return
+        except aiohttp.ClientError as err:
+            _LOGGER.exception("Error while %s fetching data: %s", self._objectid, err)
+            return
+
+        if value is None:
+            _LOGGER.error("Unable to update %s", self._objectid)
+            return
+
+        self._value = value
+
+        entities = []
+        if type(value) is dict:
+            for childid in value:
+                await async_setup_sensor(self.hass, self._data, {}, entities, childid, self)
+
+        if entities:
+            self._async_add_entities(entities, False)
+        self._async_add_entities = None
+
+        sensors = self.get_all_sensors()
+        if len(sensors) > 1:
+            await create_group(self.hass, self.name, sensors)
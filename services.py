@@ -1,19 +1,31 @@
 """Services for TecoAPI."""
 import logging
 import json
+import asyncio
 
 import voluptuous as vol
 
 import homeassistant.helpers.config_validation as cv
+from homeassistant.const import SERVICE_RELOAD
+from homeassistant.helpers.reload import async_integration_yaml_config
 
 from .const import (
     DATA_TECOAPI,
     DOMAIN,
     SERVICE_SET_OBJECT,
     SERVICE_GET_OBJECT,
+    SERVICE_DIAGNOSTICS,
+    SERVICE_PROFILE,
     CONF_OBJECT,
     CONF_VALUE,
+    CONF_CYCLES,
+    CONF_CPU,
+    CONF_FILENAME,
+    DEFAULT_PROFILE_CYCLES,
+    DEFAULT_PROFILE_FILENAME,
 )
+from .sensor import SCAN_INTERVAL
+from .profiler import Profiler
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,6 +45,46 @@ async def async_register_services(hass):
             json.dumps(value, indent=1), "Nibe get parameter result"
         )
 
+    async def get_diagnostics(call):
+        data = hass.data[DATA_TECOAPI]
+
+        hass.components.persistent_notification.async_create(
+            json.dumps(data.diagnostics, indent=1), "TecoAPI diagnostics"
+        )
+
+    async def profile(call):
+        data = hass.data[DATA_TECOAPI]
+
+        if data.profiler is not None:
+            _LOGGER.warning("TecoApi profile already running")
+            return
+
+        profiler = Profiler(call.data[CONF_CPU])
+        profiler.start()
+        data.profiler = profiler
+        try:
+            await asyncio.sleep(call.data[CONF_CYCLES] * SCAN_INTERVAL.total_seconds())
+        finally:
+            data.profiler = None
+            profiler.stop()
+
+        filename = hass.config.path(call.data[CONF_FILENAME])
+
+        def write_report(report):
+            with open(filename, "w") as file:
+                file.write(report)
+
+        await hass.async_add_executor_job(write_report, profiler.report())
+        _LOGGER.info("TecoApi profile written to %s", filename)
+
+    async def reload(call):
+        config = await async_integration_yaml_config(hass, DOMAIN)
+        if config is None or DOMAIN not in config:
+            _LOGGER.error("TecoApi reload failed, invalid configuration")
+            return
+
+        await hass.data[DATA_TECOAPI].async_reload(config[DOMAIN])
+
     SERVICE_SET_OBJECT_SCHEMA = vol.Schema(
         {
             vol.Required(CONF_OBJECT): cv.string,
@@ -44,6 +96,14 @@ async def async_register_services(hass):
         {vol.Required(CONF_OBJECT): cv.string}
     )
 
+    SERVICE_PROFILE_SCHEMA = vol.Schema(
+        {
+            vol.Optional(CONF_CYCLES, default=DEFAULT_PROFILE_CYCLES): cv.positive_int,
+            vol.Optional(CONF_CPU, default=False): cv.boolean,
+            vol.Optional(CONF_FILENAME, default=DEFAULT_PROFILE_FILENAME): cv.string,
+        }
+    )
+
     hass.services.async_register(
         DOMAIN, SERVICE_SET_OBJECT, set_parameter, SERVICE_SET_OBJECT_SCHEMA
     )
@@ -51,3 +111,15 @@ async def async_register_services(hass):
     hass.services.async_register(
         DOMAIN, SERVICE_GET_OBJECT, get_parameter, SERVICE_GET_OBJECT_SCHEMA
     )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_DIAGNOSTICS, get_diagnostics
+    )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, profile, SERVICE_PROFILE_SCHEMA
+    )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_RELOAD, reload
+    )
@@ -53,9 +53,8 @@ async def async_setup_platform(hass, config, async_add_entities, discovery_info=
         objectid = config.get(CONF_OBJECT)
         await async_setup_switch(hass, data, config, entities, objectid)
     else:
-        for child_config in discovery_info:
-            objectid = child_config.get(CONF_OBJECT)
-            await async_setup_switch(hass, data, child_config, entities, objectid)
+        data.platforms[DOMAIN_SWITCH] = (async_add_entities, async_setup_switch, None)
+        await data.async_add_objects(DOMAIN_SWITCH, discovery_info)
 
     async_add_entities(entities, True)
 
@@ -178,6 +177,16 @@ class TecoApiSwitch(SwitchEntity):
             except aiohttp.ClientError as err:
                 _LOGGER.error("Error while %s switching off %s", self._objectid, err)
 
+    async def async_added_to_hass(self):
+        """Register root entities for refreshes after writes."""
+        if self._parent is None:
+            self._data.register_root(self)
+
+    async def async_will_remove_from_hass(self):
+        """Unregister root entities."""
+        if self._parent is None:
+            self._data.unregister_root(self)
+
     async def async_update(self):
         """Get the current state, catching errors."""
         if self._parent is None:
@@ -186,7 +195,7 @@ class TecoApiSwitch(SwitchEntity):
                 if value is None:
                     _LOGGER.error("Unable to update %s", self._objectid)
                 else:
-                    self._value = value
+                    self.set_value(value)
 
             except asyncio.TimeoutError:
                 _LOGGER.warning("Timed out %s while fetching data", self._objectid)
@@ -194,6 +203,10 @@ class TecoApiSwitch(SwitchEntity):
                 _LOGGER.exception("Error while %s fetching data: %s", self._objectid, err)
 
     ### Heplers ###
+    def set_value(self, value):
+        """Store a value read for this root entity."""
+        self._value = value
+
     @property
     def child_values(self):
         if self._parent:
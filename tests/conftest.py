@@ -0,0 +1,13 @@
+"""Test configuration for TecoAPI."""
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The repository root is the integration package itself; register it as a
+# namespace so the platform modules import without running async_setup code.
+if "tecoapi" not in sys.modules:
+    package = types.ModuleType("tecoapi")
+    package.__path__ = [str(ROOT)]
+    sys.modules["tecoapi"] = package
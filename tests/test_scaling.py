@@ -0,0 +1,156 @@
+"""Memory and CPU scaling of TecoAPI entity trees."""
+import asyncio
+import gc
+import json
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from tecoapi.const import CONF_ARRAYSIZE, CONF_COMPACT, TECOAPI_GETOBJECT  # noqa: E402
+from tecoapi.sensor import async_setup_sensor  # noqa: E402
+from tecoapi.switch import async_setup_switch  # noqa: E402
+from tecoapi.binary_sensor import async_setup_binary_sensor  # noqa: E402
+
+BASELINE = Path(__file__).with_name("scaling_baseline.json")
+SIZES = (100, 1000, 5000)
+CYCLES = 5
+GROUP = 10
+
+# Measured values may exceed the baseline by this share, plus an absolute
+# slack for figures close to zero, before the test fails.
+TOLERANCE = {"bytes_per_leaf": 0.25, "update_bytes_per_leaf": 0.25, "objects_per_leaf": 0.25, "cpu_us_per_leaf": 1.0}
+SLACK = {"bytes_per_leaf": 16, "update_bytes_per_leaf": 16, "objects_per_leaf": 0.05, "cpu_us_per_leaf": 0.5}
+
+# Per leaf figures of the largest tree may exceed those of the smallest by this factor.
+GROWTH = {"bytes_per_leaf": 1.5, "update_bytes_per_leaf": 1.5, "objects_per_leaf": 1.5, "cpu_us_per_leaf": 2.0}
+
+# CPU time depends on the machine, so it is compared against the baseline only on request.
+CHECK_CPU = bool(os.environ.get("TECOAPI_CHECK_CPU"))
+
+def tree_payload(leaves, cycle):
+    """Return a GetObject structure of groups of GROUP REAL leaves."""
+    return {
+        f"G{group}": {f"L{leaf}": float(group * GROUP + leaf + cycle) for leaf in range(GROUP)}
+        for group in range(leaves // GROUP)
+    }
+
+def bool_payload(leaves, cycle):
+    """Return a GetObject structure of groups of GROUP BOOL leaves."""
+    return {
+        f"G{group}": {f"L{leaf}": (group + leaf + cycle) % 2 == 0 for leaf in range(GROUP)}
+        for group in range(leaves // GROUP)
+    }
+
+def array_payload(leaves, cycle):
+    """Return a GetObject REAL array."""
+    return [float(i + cycle) for i in range(leaves)]
+
+SCENARIOS = {
+    "tree": (async_setup_sensor, {}, tree_payload),
+    "compact": (async_setup_sensor, {CONF_COMPACT: True}, tree_payload),
+    "array": (async_setup_sensor, {CONF_ARRAYSIZE: None}, array_payload),
+    "switch": (async_setup_switch, {}, bool_payload),
+    "binary_sensor": (async_setup_binary_sensor, {}, bool_payload),
+}
+
+class StubData:
+    """TecoApiData stand-in serving synthetic GetObject payloads."""
+
+    def __init__(self, payload, leaves):
+        """Init."""
+        self.payload = payload
+        self.leaves = leaves
+        self.cycle = 0
+
+    async def async_get(self, service, objectid, wait, array = False):
+        """Return the payload of the current cycle."""
+        assert service == TECOAPI_GETOBJECT
+        return self.payload(self.leaves, self.cycle)
+
+def read_states(entities):
+    """Read what Home Assistant reads on a state write."""
+    for entity in entities:
+        _ = entity.state
+        _ = entity.extra_state_attributes
+
+async def async_update_cycles(data, roots, entities, first):
+    """Run CYCLES update cycles starting at cycle first."""
+    for cycle in range(first, first + CYCLES):
+        data.cycle = cycle
+        for root in roots:
+            await root.async_update()
+        read_states(entities)
+
+async def async_measure(scenario, leaves):
+    """Build an entity tree, run update cycles and return per leaf figures."""
+    setup, extra, payload = SCENARIOS[scenario]
+    config = dict(extra)
+    if CONF_ARRAYSIZE in config:
+        config[CONF_ARRAYSIZE] = leaves
+    data = StubData(payload, leaves)
+
+    gc.collect()
+    objects = len(gc.get_objects())
+    tracemalloc.start()
+
+    entities = []
+    await setup(None, data, config, entities, "Root")
+    read_states(entities)
+
+    _, peak = tracemalloc.get_traced_memory()
+    gc.collect()
+    objects = len(gc.get_objects()) - objects
+
+    # Peak allocation above the built tree while it is updated.
+    roots = [entity for entity in entities if entity._parent is None]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    await async_update_cycles(data, roots, entities, 1)
+    _, update_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.process_time()
+    await async_update_cycles(data, roots, entities, CYCLES + 1)
+    cpu = (time.process_time() - start) / CYCLES
+
+    return {
+        "entities": len(entities),
+        "bytes_per_leaf": peak / leaves,
+        "update_bytes_per_leaf": (update_peak - current) / leaves,
+        "objects_per_leaf": objects / leaves,
+        "cpu_us_per_leaf": cpu / leaves * 1e6,
+    }
+
+def measure(scenario, leaves):
+    """Run async_measure in a fresh event loop."""
+    return asyncio.run(async_measure(scenario, leaves))
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_scaling(scenario):
+    """Per leaf cost stays flat as trees grow and within the stored baseline."""
+    results = {leaves: measure(scenario, leaves) for leaves in SIZES}
+
+    if os.environ.get("TECOAPI_UPDATE_BASELINE"):
+        baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+        baseline[scenario] = {key: round(value, 3) for key, value in results[SIZES[-1]].items() if key != "entities"}
+        BASELINE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        pytest.skip("baseline updated")
+
+    smallest, largest = results[SIZES[0]], results[SIZES[-1]]
+    for key, growth in GROWTH.items():
+        assert largest[key] <= smallest[key] * growth + SLACK[key], (
+            f"{scenario} {key} grows from {smallest[key]:.3f} to {largest[key]:.3f} per leaf"
+        )
+
+    baseline = json.loads(BASELINE.read_text())[scenario]
+    for key, tolerance in TOLERANCE.items():
+        if key == "cpu_us_per_leaf" and not CHECK_CPU:
+            continue
+        assert largest[key] <= baseline[key] * (1 + tolerance) + SLACK[key], (
+            f"{scenario} {key} {largest[key]:.3f} exceeds baseline {baseline[key]:.3f}"
+        )